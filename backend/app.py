@@ -1,19 +1,116 @@
 
 
-from flask import Flask, render_template, request, session, redirect, url_for, jsonify
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, g, has_request_context
+import hashlib
+import logging
 import sys
 import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from session_store import SimpleSessionStore
+import uuid
+# Add parent directory to the system path (once, even if the module is reloaded)
+PARENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PARENT_DIR not in sys.path:
+    sys.path.append(PARENT_DIR)
+from session_store import SimpleSessionStore, SQLiteSessionStore
+
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret')
 
-# Use the existing session store
-store = SimpleSessionStore()
+# Keep Flask sessions server-side in Redis when configured, so the cookie is
+# only an opaque id (requires Flask-Session and redis)
+if os.environ.get('SESSION_REDIS_URL'):
+    import redis
+    from flask_session import Session
+
+    app.config.update(
+        SESSION_TYPE='redis',
+        SESSION_REDIS=redis.Redis.from_url(os.environ['SESSION_REDIS_URL']),
+    )
+    Session(app)
+
+
+class RequestCachedStore:
+    """
+    Proxy around a session store that memoizes reads for the current request.
+
+    Repeated get_session/list_sessions calls within one request return the
+    cached result; any method in WRITE_METHODS clears the request cache.
+    """
+
+    WRITE_METHODS = {'create_session', 'add_message', 'add_messages',
+                     'delete_session', 'cleanup_old_sessions'}
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name not in self.WRITE_METHODS:
+            return attr
+
+        def write(*args, **kwargs):
+            self._invalidate()
+            return attr(*args, **kwargs)
+        return write
+
+    def _cache(self):
+        # flask.g is per request, so the cache never outlives the request
+        if not has_request_context():
+            return None
+        return g.setdefault('session_cache', {})
+
+    def _cached(self, key, load):
+        cache = self._cache()
+        if cache is None:
+            return load()
+        if key not in cache:
+            cache[key] = load()
+        return cache[key]
+
+    def _invalidate(self):
+        cache = self._cache()
+        if cache is not None:
+            cache.clear()
+
+    def get_session(self, session_id):
+        return self._cached(('session', session_id),
+                            lambda: self._inner.get_session(session_id))
+
+    def list_sessions(self, user_id=None):
+        return self._cached(('list', user_id),
+                            lambda: self._inner.list_sessions(user_id))
 
-# Add parent directory to the system path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Pick the storage backend: 'file' (default) or 'sqlite'
+STORE_BACKENDS = {'file': SimpleSessionStore, 'sqlite': SQLiteSessionStore}
+store = RequestCachedStore(STORE_BACKENDS[os.environ.get('SESSION_BACKEND', 'file')]())
+
+
+# Part of every ETag, so a deploy (new templates or code) invalidates cached
+# pages; set APP_VERSION to share ETags across worker processes
+APP_VERSION = os.environ.get('APP_VERSION') or uuid.uuid4().hex
+
+
+def make_etag(*parts):
+    """Build a short ETag from the app version and the state a response depends on."""
+    key = '|'.join(map(str, (APP_VERSION,) + parts))
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already has this version."""
+    if request.if_none_match.contains(etag):
+        return with_etag(('', 304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Attach an ETag and ask the browser to revalidate before reusing it."""
+    response = app.make_response(response)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 # Route to start a new chat session
@@ -30,12 +127,20 @@ def chat():
         return redirect(url_for('login'))
     user_id = session['user_id']
     session_id = session['session_id']
-    chat_history = store.get_session_messages(session_id)
     if request.method == 'POST':
         message = request.form['message']
         store.add_message(session_id, role='user', content=message)
         chat_history = store.get_session_messages(session_id)
-    return render_template('chat.html', chat_history=chat_history, user_id=user_id)
+        return render_template('chat.html', chat_history=chat_history, user_id=user_id)
+
+    # Skip loading and rendering the history if the browser's copy is current
+    summary = store.get_session_summary(session_id) or {}
+    etag = make_etag(user_id, session_id, summary.get('message_count'), summary.get('last_updated'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    chat_history = store.get_session_messages(session_id)
+    return with_etag(render_template('chat.html', chat_history=chat_history, user_id=user_id), etag)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -61,18 +166,13 @@ def list_sessions():
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
     user_id = session['user_id']
+    etag = make_etag(user_id, store.get_sessions_version(user_id))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    # Summaries already carry 'first_message' for the session titles
     sessions = store.list_sessions(user_id=user_id)
-    # Add first message as 'first_message' for each session
-    sessions_with_titles = []
-    for s in sessions:
-        session_data = store.get_session(s['session_id'])
-        first_message = ''
-        if session_data and session_data.get('messages'):
-            first_message = session_data['messages'][0]['content']
-        s_copy = dict(s)
-        s_copy['first_message'] = first_message
-        sessions_with_titles.append(s_copy)
-    return jsonify({'sessions': sessions_with_titles})
+    return with_etag(jsonify({'sessions': sessions}), etag)
 
 # Route to load a past session as the active chat session
 @app.route('/load_session/<session_id>', methods=['POST'])
@@ -80,8 +180,7 @@ def load_session(session_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
     # Optionally, check if the session_id belongs to the user
-    sessions = store.list_sessions(user_id=session['user_id'])
-    if not any(s['session_id'] == session_id for s in sessions):
+    if not store.owns(session['user_id'], session_id):
         return jsonify({'error': 'Session not found or not authorized'}), 404
     session['session_id'] = session_id
     return jsonify({'success': True, 'redirect': url_for('chat')})
@@ -92,45 +191,10 @@ def delete_session(session_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
     # Only allow deleting sessions belonging to the user
-    sessions = store.list_sessions(user_id=session['user_id'])
-    if not any(s['session_id'] == session_id for s in sessions):
+    if not store.owns(session['user_id'], session_id):
         return jsonify({'error': 'Session not found or not authorized'}), 404
     success = store.delete_session(session_id)
     return jsonify({'success': success})
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
-
-
-# List all sessions for the current user
-@app.route('/sessions', methods=['GET'])
-def list_sessions():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not logged in'}), 401
-    user_id = session['user_id']
-    sessions = store.list_sessions(user_id=user_id)
-    return jsonify({'sessions': sessions})
-
-# Route to load a past session as the active chat session
-@app.route('/load_session/<session_id>', methods=['POST'])
-def load_session(session_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not logged in'}), 401
-    # Optionally, check if the session_id belongs to the user
-    sessions = store.list_sessions(user_id=session['user_id'])
-    if not any(s['session_id'] == session_id for s in sessions):
-        return jsonify({'error': 'Session not found or not authorized'}), 404
-    session['session_id'] = session_id
-    return jsonify({'success': True, 'redirect': url_for('chat')})
-
-# Route to delete a session
-@app.route('/delete_session/<session_id>', methods=['POST'])
-def delete_session(session_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not logged in'}), 401
-    # Only allow deleting sessions belonging to the user
-    sessions = store.list_sessions(user_id=session['user_id'])
-    if not any(s['session_id'] == session_id for s in sessions):
-        return jsonify({'error': 'Session not found or not authorized'}), 404
-    success = store.delete_session(session_id)
-    return jsonify({'success': success})
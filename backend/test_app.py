@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test suite for the Flask chat app
+Run with: python -m pytest backend/test_app.py -v
+"""
+
+import pytest
+import tempfile
+import shutil
+
+pytest.importorskip("flask")
+
+import app as chat_app
+from session_store import SimpleSessionStore, SQLiteSessionStore
+
+@pytest.fixture(params=[SimpleSessionStore, SQLiteSessionStore])
+def client(request, monkeypatch):
+    """Create a logged-in test client backed by a temporary store, once per backend."""
+    temp_dir = tempfile.mkdtemp()
+    store = request.param(temp_dir)
+    monkeypatch.setattr(chat_app, "store", chat_app.RequestCachedStore(store))
+    client = chat_app.app.test_client()
+    client.post('/login', data={'user_id': 'test_user'})
+    yield client
+
+    # Cleanup
+    store.close()
+    shutil.rmtree(temp_dir)
+
+def test_chat_not_modified(client):
+    """Test that the chat page answers 304 until a message changes it."""
+    response = client.get('/')
+    etag = response.headers['ETag']
+
+    cached = client.get('/', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+    assert cached.headers['Cache-Control'] == 'private, no-cache'
+
+    client.post('/', data={'message': 'Hello'})
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'Hello' in response.data
+    assert response.headers['ETag'] != etag
+
+def test_sessions_not_modified(client):
+    """Test that the session list answers 304 until a write changes it."""
+    response = client.get('/sessions')
+    etag = response.headers['ETag']
+
+    cached = client.get('/sessions', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['Cache-Control'] == 'private, no-cache'
+
+    client.post('/', data={'message': 'Hello'})
+    response = client.get('/sessions', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['sessions'][0]['first_message'] == 'Hello'
+
+    etag = response.headers['ETag']
+    client.post('/new_chat')
+    response = client.get('/sessions', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.json['sessions']) == 2
+
+def test_etag_depends_on_app_version(client, monkeypatch):
+    """Test that a new app version invalidates cached pages."""
+    etag = client.get('/').headers['ETag']
+    monkeypatch.setattr(chat_app, "APP_VERSION", "next-release")
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 200
@@ -5,6 +5,8 @@ This script demonstrates all the features of the SimpleSessionStore class.
 """
 
 from session_store import SimpleSessionStore
+import logging
+import sys
 import time
 
 def print_separator(title):
@@ -31,6 +33,10 @@ def main():
     """Main lab execution function."""
     print("🚀 Starting File-Based Session Storage Lab")
 
+    # Show the session store's own activity log alongside the lab output
+    logging.basicConfig(level=logging.DEBUG, format="   [store] %(message)s",
+                        stream=sys.stdout)
+
     # Initialize the session store
     store = SimpleSessionStore("session_storage")
 
@@ -45,19 +51,23 @@ def main():
 
     # Add messages to session 1
     print(f"📝 Adding messages to session: {session1[:8]}...")
-    store.add_message(session1, "user", "How do I create a virtual environment in Python?")
-    store.add_message(session1, "assistant", "You can create a virtual environment using: python -m venv myenv")
-    store.add_message(session1, "user", "How do I activate it?")
-    store.add_message(session1, "assistant", "On Windows: myenv\\Scripts\\activate, On Unix: source myenv/bin/activate")
+    store.add_messages(session1, [
+        ("user", "How do I create a virtual environment in Python?"),
+        ("assistant", "You can create a virtual environment using: python -m venv myenv"),
+        ("user", "How do I activate it?"),
+        ("assistant", "On Windows: myenv\\Scripts\\activate, On Unix: source myenv/bin/activate"),
+    ])
 
     # Add messages to session 2
     print(f"📝 Adding messages to session: {session2[:8]}...")
-    store.add_message(session2, "user", "What is Docker?")
-    store.add_message(session2, "assistant", "Docker is a platform for containerizing applications")
-    store.add_message(session2, "user", "How do I run a container?")
-    store.add_message(session2, "assistant", "Use: docker run image_name")
-
-    # Add messages to session 3
+    store.add_messages(session2, [
+        ("user", "What is Docker?"),
+        ("assistant", "Docker is a platform for containerizing applications"),
+        ("user", "How do I run a container?"),
+        ("assistant", "Use: docker run image_name"),
+    ])
+
+    # Add a single message at a time to session 3
     print(f"📝 Adding messages to session: {session3[:8]}...")
     store.add_message(session3, "user", "Hello!")
     store.add_message(session3, "assistant", "Hi there! How can I help you today?")
@@ -127,6 +137,7 @@ def main():
 
     # Create a new store instance to test persistence
     print("🔄 Testing persistence by creating new store instance...")
+    store.close()
     new_store = SimpleSessionStore("session_storage")
 
     # Try to retrieve existing session
@@ -1,42 +1,560 @@
+import bisect
+import copy
+import gzip
 import json
+import logging
 import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from itertools import islice
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _metadata_json(metadata: Optional[Dict]) -> Optional[str]:
+    """Serialize metadata for a database column, storing NULL when empty."""
+    return _dumps(metadata).decode('utf-8') if metadata else None
+
+
+def _read_json(path: str):
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def _now() -> str:
+    """Current local time as an ISO 8601 string (patch this to control timestamps)."""
+    return datetime.now().isoformat()
+
+
+def _build_messages(first_id: int, messages: List[Tuple]) -> List[Dict]:
+    """
+    Build message records from ``(role, content[, metadata])`` tuples.
+
+    The "metadata" key is only set when a message has metadata, which keeps
+    the common case smaller on disk and avoids an empty dict per message.
+    """
+    now = _now()
+    records = []
+    for i, (role, content, *rest) in enumerate(messages):
+        record = {
+            "id": first_id + i,
+            "role": role.strip().lower(),
+            "content": content.strip(),
+            "timestamp": now
+        }
+        if rest and rest[0]:
+            record["metadata"] = rest[0]
+        records.append(record)
+    return records
+
+
+def _copy_message(message: Dict) -> Dict:
+    """Copy a message record, including its metadata."""
+    message_copy = dict(message)
+    if "metadata" in message:
+        message_copy["metadata"] = copy.deepcopy(message["metadata"])
+    return message_copy
+
+
+def _copy_session(session_data: Dict) -> Dict:
+    """Copy a cached session so callers can't modify the cache through it."""
+    session_copy = dict(session_data)
+    session_copy["metadata"] = copy.deepcopy(session_data["metadata"])
+    session_copy["messages"] = [_copy_message(m) for m in session_data["messages"]]
+    return session_copy
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """Cache a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str):
+        """Drop a cached value if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop all cached values."""
+        with self._lock:
+            self._data.clear()
+
 
 class SimpleSessionStore:
     """
     A simple session storage system using JSON files for persistence.
 
+    Each session lives in its own directory holding a small ``meta.json`` and
+    an append-only ``messages.jsonl`` log, so adding a message only writes
+    the new message regardless of how long the conversation is.
+
     Features:
     - Create and manage conversation sessions
     - Add messages to sessions with timestamps
     - Retrieve complete conversation history
     - List all active sessions
     - Clean up old sessions
+
+    Logs of sessions that have gone cold can be gzip-compressed as a whole
+    (``messages.jsonl.gz``, see compress_idle_sessions); the next message to
+    such a session turns its log back into a plain one. Logs in either
+    format are read transparently.
+
+    Message writes only update the in-memory index; it is written out at
+    most every ``index_flush_interval`` seconds, on create/delete, and on
+    flush()/close(). Anything not yet flushed is recovered from the message
+    logs the next time a store is opened, and before a session's first
+    append its summary is checked against the log, so message ids always
+    continue from the log rather than from a possibly stale index.
+
+    Index and metadata files are replaced atomically (temp file +
+    ``os.replace``), so a crash never leaves them half-written. Pass
+    ``durable=True`` to also fsync every write.
+
+    The store is safe to share between threads: index updates are guarded by
+    a global lock and each session's log by its own lock. Recently read
+    sessions are kept in a short-lived in-memory cache.
+
+    Only one process (and one store instance) may write to a storage
+    directory at a time; the index is reconciled with the session directories
+    when a store is opened, but concurrent writers are not coordinated. Use
+    SQLiteSessionStore for multiple worker processes.
     """
 
-    def __init__(self, storage_dir: str = "sessions"):
+    def __init__(self, storage_dir: str = "sessions", cache_size: int = 1024,
+                 cache_ttl: float = 5.0, compress_after_days: Optional[float] = None,
+                 durable: bool = False, index_flush_interval: float = 5.0):
         """
         Initialize the session store.
 
         Args:
             storage_dir: Directory to store session files
+            cache_size: Maximum number of sessions kept in the read cache
+            cache_ttl: Seconds a cached session stays valid (0 disables caching)
+            compress_after_days: Let cleanup_old_sessions also gzip the logs of
+                sessions idle for this many days (None disables compression)
+            durable: fsync files after every write
+            index_flush_interval: Seconds between index writes caused by new messages
         """
         import os
+        self.compress_after_days = compress_after_days
+        self.durable = durable
+        self.index_flush_interval = index_flush_interval
+        self._index_dirty = False
+        self._last_flush = time.monotonic()
         BASE_DIR = os.path.dirname(os.path.abspath(__file__))
         self.storage_dir = os.path.join(BASE_DIR, storage_dir)
         self._ensure_storage_dir()
+        self._global_lock = threading.RLock()
+        self._session_locks: Dict[str, threading.Lock] = {}
+        # Sessions whose log tail has been checked for torn writes
+        self._repaired: set = set()
+        self._cache = _TTLCache(cache_size, cache_ttl)
+        self._index_path = os.path.join(self.storage_dir, "_index.json")
+        self._index: Dict[str, Dict] = self._load_index()
+
+        # (last_updated, session_id) keys kept sorted, overall and per user
+        self._recency: List[Tuple[str, str]] = []
+        self._user_recency: Dict[Optional[str], List[Tuple[str, str]]] = {}
+        # Bumped on every change to the orderings; the epoch keeps versions
+        # from different store instances apart
+        self._epoch = uuid.uuid4().hex[:8]
+        self._generation = 0
+        self._user_generations: Dict[Optional[str], int] = {}
+        for summary in self._index.values():
+            self._track(summary)
 
     def _ensure_storage_dir(self):
         """Create storage directory if it doesn't exist."""
         if not os.path.exists(self.storage_dir):
             os.makedirs(self.storage_dir)
-            print(f"✅ Created storage directory: {self.storage_dir}")
+            logger.debug("Created storage directory: %s", self.storage_dir)
+
+    def _get_session_dir(self, session_id: str) -> str:
+        """Get the directory for a session."""
+        return os.path.join(self.storage_dir, session_id)
+
+    def _get_meta_file(self, session_id: str) -> str:
+        """Get the metadata file path for a session."""
+        return os.path.join(self.storage_dir, session_id, "meta.json")
+
+    def _get_messages_file(self, session_id: str) -> str:
+        """Get the message log file path for a session (plain, or gzip-compressed once cold)."""
+        messages_file = os.path.join(self.storage_dir, session_id, "messages.jsonl")
+        # A plain log wins: it is the newer copy if a (de)compression was interrupted
+        if not os.path.exists(messages_file) and os.path.exists(messages_file + ".gz"):
+            return messages_file + ".gz"
+        return messages_file
+
+    @staticmethod
+    def _open_messages(messages_file: str):
+        """Open a message log for reading, decompressing ``.gz`` logs on the fly."""
+        if messages_file.endswith(".gz"):
+            return gzip.open(messages_file, 'rb')
+        return open(messages_file, 'rb')
 
-    def _get_session_file(self, session_id: str) -> str:
-        """Get the file path for a session."""
-        return os.path.join(self.storage_dir, f"{session_id}.json")
+    @staticmethod
+    def _encode_messages(messages: List[Dict]) -> bytes:
+        """Encode messages as log lines."""
+        return b"".join(_dumps(message) + b"\n" for message in messages)
+
+    def _append_messages(self, session_id: str, messages: List[Dict]):
+        """Append messages to a session's log; the caller must hold the session's lock."""
+        messages_file = self._get_messages_file(session_id)
+        try:
+            with open(messages_file, 'ab') as f:
+                f.write(self._encode_messages(messages))
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            # The write may have been torn; check the tail again before the next one
+            self._repaired.discard(session_id)
+            raise
+
+    def _sync_with_log(self, session_id: str, summary: Dict):
+        """
+        Repair a session's log and bring its summary in line with it.
+
+        Runs before the first append to each session, so new message ids
+        continue from the log even if the index on disk was stale. The
+        caller must hold the session's lock.
+        """
+        if self._get_messages_file(session_id).endswith(".gz"):
+            self._decompress_log(session_id)
+        last_id = self._repair_log(self._get_messages_file(session_id))
+        if last_id != summary["message_count"]:
+            session_data = self._read_session(session_id)
+            if session_data is None:
+                raise OSError(f"cannot read message log of session {session_id}")
+            logger.warning("Index entry for session %s was stale; re-read its log", session_id)
+            self._cache.pop(session_id)
+            with self._global_lock:
+                self._untrack(summary)
+                summary.update(self._summarize(session_data))
+                self._track(summary)
+                self._index_dirty = True
+        self._repaired.add(session_id)
+
+    def _repair_log(self, messages_file: str) -> Optional[int]:
+        """
+        Truncate a torn write from the end of a message log.
+
+        Without this, the next append would be glued onto the partial line
+        and become unreadable too.
+
+        Returns:
+            Id of the last complete message (0 for an empty log), or None if
+            it can't be parsed
+        """
+        if not os.path.exists(messages_file):
+            return 0
+        with open(messages_file, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            end, last_line = self._last_line(f, size)
+            if end < size:
+                logger.warning("Truncating torn write at the end of %s", messages_file)
+                f.truncate(end)
+        if not last_line.strip():
+            return 0
+        try:
+            return _loads(last_line)["id"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _last_line(f, size: int) -> Tuple[int, bytes]:
+        """
+        Scan a plain log backwards for its last complete line.
+
+        Returns:
+            Offset just past that line's newline (0 if there is none) and the
+            line without its newline
+        """
+        pos, buf, end = size, b"", None
+        while True:
+            if end is None:
+                newline = buf.rfind(b"\n")
+                if newline != -1:
+                    end = pos + newline + 1
+                    buf = buf[:newline]
+            if end is not None:
+                newline = buf.rfind(b"\n")
+                if newline != -1:
+                    return end, buf[newline + 1:]
+            if pos == 0:
+                return (0, b"") if end is None else (end, buf)
+            start = max(0, pos - 4096)
+            f.seek(start)
+            buf = f.read(pos - start) + buf
+            pos = start
+
+    def _compress_log(self, session_id: str) -> bool:
+        """Replace a session's plain log with a gzip copy; the caller must hold the session's lock."""
+        messages_file = os.path.join(self.storage_dir, session_id, "messages.jsonl")
+        if not os.path.exists(messages_file):
+            return False
+        with open(messages_file, 'rb') as f:
+            data = f.read()
+        self._write_atomic(messages_file + ".gz", gzip.compress(data))
+        os.remove(messages_file)
+        # The next append has to turn the log back into a plain one first
+        self._repaired.discard(session_id)
+        return True
+
+    def _decompress_log(self, session_id: str):
+        """Replace a session's gzip log with a plain copy; the caller must hold the session's lock."""
+        messages_file = os.path.join(self.storage_dir, session_id, "messages.jsonl")
+        with gzip.open(messages_file + ".gz", 'rb') as f:
+            data = f.read()
+        self._write_atomic(messages_file, data)
+        os.remove(messages_file + ".gz")
+
+    def _write_atomic(self, path: str, data: bytes):
+        """Write a file via a temp file and os.replace so readers never see a partial write."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """
+        Load the session summary index and reconcile it with the session directories.
+
+        Sessions missing from the index, or whose message log changed after
+        the index was last written, are re-read from disk; index entries
+        without a session directory are dropped.
+        """
+        index, index_mtime = {}, None
+        if os.path.exists(self._index_path):
+            try:
+                index = _read_json(self._index_path)
+                index_mtime = os.stat(self._index_path).st_mtime_ns
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error("Error loading session index, rebuilding: %s", e)
+                index = {}
+
+        changed = index_mtime is None
+        on_disk = set()
+        with os.scandir(self.storage_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            session_id = entry.name
+            if entry.name.endswith('.json') and entry.name != "_index.json" and entry.is_file():
+                session_id = entry.name[:-5]
+                self._migrate_legacy_session(session_id)
+            elif not entry.is_dir():
+                continue
+
+            if session_id not in index or self._log_modified_since(session_id, index_mtime):
+                session_data = self._read_session(session_id)
+                if not session_data:
+                    continue
+                index[session_id] = self._summarize(session_data)
+                changed = True
+            on_disk.add(session_id)
+
+        for session_id in set(index) - on_disk:
+            del index[session_id]
+            changed = True
+
+        self._index = index
+        if changed:
+            self._flush_index()
+        return index
+
+    def _log_modified_since(self, session_id: str, mtime_ns: Optional[int]) -> bool:
+        """Check whether a session's message log was written at or after ``mtime_ns``."""
+        if mtime_ns is None:
+            return True
+        try:
+            return os.stat(self._get_messages_file(session_id)).st_mtime_ns >= mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def _migrate_legacy_session(self, session_id: str):
+        """Convert a single-file ``<session_id>.json`` session to the directory layout."""
+        legacy_file = os.path.join(self.storage_dir, f"{session_id}.json")
+        try:
+            session_data = _read_json(legacy_file)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Error migrating session %s: %s", session_id, e)
+            return
+
+        os.makedirs(self._get_session_dir(session_id), exist_ok=True)
+        self._write_meta(session_id, session_data)
+        self._write_atomic(self._get_messages_file(session_id),
+                           self._encode_messages(session_data.get("messages", [])))
+        os.remove(legacy_file)
+
+    @staticmethod
+    def _summarize(session_data: Dict) -> Dict:
+        """Build the index entry for a session."""
+        messages = session_data.get("messages", [])
+        return {
+            "session_id": session_data["session_id"],
+            "user_id": session_data.get("user_id"),
+            "created_at": session_data["created_at"],
+            "last_updated": session_data["last_updated"],
+            "message_count": session_data["message_count"],
+            "first_message": messages[0]["content"] if messages else ""
+        }
+
+    def _session_lock(self, session_id: str) -> Optional[threading.Lock]:
+        """Get the lock guarding a session's files, or None if the session doesn't exist."""
+        with self._global_lock:
+            lock = self._session_locks.get(session_id)
+            if lock is None:
+                # Unknown ids get no lock, so lookups of missing sessions leave nothing behind
+                if session_id not in self._index and not self._has_meta(session_id):
+                    return None
+                lock = self._session_locks[session_id] = threading.Lock()
+            return lock
+
+    def _has_meta(self, session_id: str) -> bool:
+        """Check whether a session id names a session directory with a meta.json."""
+        if session_id in ("", ".", "..") or os.path.basename(session_id) != session_id:
+            return False
+        return os.path.exists(self._get_meta_file(session_id))
+
+    def _get_summary(self, session_id: str) -> Optional[Dict]:
+        """Get a session's index entry, indexing sessions found only on disk."""
+        with self._global_lock:
+            summary = self._index.get(session_id)
+        if summary is not None:
+            return summary
+        lock = self._session_lock(session_id)
+        if lock is None:
+            return None
+        with lock:
+            return self._get_summary_locked(session_id)
+
+    def _get_summary_locked(self, session_id: str) -> Optional[Dict]:
+        """Get a session's index entry; the caller must hold the session's lock."""
+        with self._global_lock:
+            summary = self._index.get(session_id)
+        if summary is not None:
+            return summary
+        session_data = self._read_session(session_id)
+        if session_data is None:
+            return None
+        with self._global_lock:
+            summary = self._index.get(session_id)
+            if summary is None:
+                summary = self._add_to_index(self._summarize(session_data))
+                self._index_dirty = True
+            return summary
+
+    def _add_to_index(self, summary: Dict) -> Dict:
+        """Add a summary to the index; the caller must hold the global lock."""
+        self._index[summary["session_id"]] = summary
+        self._track(summary)
+        return summary
+
+    def _track(self, summary: Dict):
+        """Insert a summary into the recency orderings; the caller must hold the global lock."""
+        key = (summary["last_updated"], summary["session_id"])
+        bisect.insort(self._recency, key)
+        bisect.insort(self._user_recency.setdefault(summary["user_id"], []), key)
+        self._bump_generation(summary["user_id"])
+
+    def _untrack(self, summary: Dict):
+        """Remove a summary from the recency orderings; the caller must hold the global lock."""
+        key = (summary["last_updated"], summary["session_id"])
+        for keys in (self._recency, self._user_recency.get(summary["user_id"], [])):
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+        self._bump_generation(summary["user_id"])
+
+    def _bump_generation(self, user_id: Optional[str]):
+        """Record a change to a user's sessions; the caller must hold the global lock."""
+        self._generation += 1
+        self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+
+    def _flush_index(self):
+        """Atomically write the session index to disk; the caller must hold the global lock."""
+        try:
+            self._write_atomic(self._index_path, _dumps(self._index))
+        except OSError as e:
+            logger.error("Error saving session index: %s", e)
+            return
+        self._index_dirty = False
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Write any index changes that haven't been flushed yet."""
+        with self._global_lock:
+            if self._index_dirty:
+                self._flush_index()
+
+    def close(self):
+        """Flush pending index changes."""
+        self.flush()
 
     def create_session(self, user_id: str = None, metadata: Dict = None) -> str:
         """
@@ -50,19 +568,24 @@ class SimpleSessionStore:
             Session ID string
         """
         session_id = str(uuid.uuid4())
+        now = _now()
         session_data = {
             "session_id": session_id,
             "user_id": user_id,
-            "created_at": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat(),
+            "created_at": now,
+            "last_updated": now,
             "message_count": 0,
             "metadata": metadata or {},
             "messages": []
         }
 
         # Save the session
-        self._save_session(session_id, session_data)
-        print(f"✅ Created session: {session_id}")
+        os.makedirs(self._get_session_dir(session_id))
+        self._write_meta(session_id, session_data)
+        with self._global_lock:
+            self._add_to_index(self._summarize(session_data))
+            self._flush_index()
+        logger.debug("Created session: %s", session_id)
         return session_id
 
     def add_message(self, session_id: str, role: str, content: str,
@@ -70,39 +593,75 @@ class SimpleSessionStore:
         """
         Add a message to a session.
 
+        The message is appended to the session's log; earlier messages are
+        never rewritten.
+
         Args:
             session_id: Session to add message to
             role: Message role ('user' or 'assistant')
             content: Message content
-            metadata: Additional message metadata
+            metadata: Additional message metadata (stored only if non-empty)
 
         Returns:
             True if successful, False otherwise
         """
-        if not content.strip():
-            print("❌ Message content cannot be empty")
+        return self.add_messages(session_id, [(role, content, metadata)])
+
+    def add_messages(self, session_id: str, messages: List[Tuple]) -> bool:
+        """
+        Add several messages to a session in one write.
+
+        Args:
+            session_id: Session to add messages to
+            messages: ``(role, content)`` or ``(role, content, metadata)`` tuples
+
+        Returns:
+            True if successful, False otherwise (no messages are added)
+        """
+        if any(not message[1].strip() for message in messages):
+            logger.warning("Message content cannot be empty")
             return False
+        if not messages:
+            return True
 
-        session_data = self.get_session(session_id)
-        if not session_data:
-            print(f"❌ Session {session_id} not found")
+        lock = self._session_lock(session_id)
+        if lock is None:
+            logger.warning("Session %s not found", session_id)
             return False
+        with lock:
+            summary = self._get_summary_locked(session_id)
+            if not summary:
+                logger.warning("Session %s not found", session_id)
+                return False
 
-        message = {
-            "id": len(session_data["messages"]) + 1,
-            "role": role.strip().lower(),
-            "content": content.strip(),
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
+            try:
+                if session_id not in self._repaired:
+                    self._sync_with_log(session_id, summary)
+                new_messages = _build_messages(summary["message_count"] + 1, messages)
+                self._append_messages(session_id, new_messages)
+            except OSError as e:
+                logger.error("Error saving message to session %s: %s", session_id, e)
+                return False
 
-        session_data["messages"].append(message)
-        session_data["message_count"] = len(session_data["messages"])
-        session_data["last_updated"] = datetime.now().isoformat()
+            last = new_messages[-1]
+            with self._global_lock:
+                self._untrack(summary)
+                if summary["message_count"] == 0:
+                    summary["first_message"] = new_messages[0]["content"]
+                summary["message_count"] = last["id"]
+                summary["last_updated"] = last["timestamp"]
+                self._track(summary)
+                # The log is the source of truth, so the index is flushed lazily
+                self._index_dirty = True
+                if time.monotonic() - self._last_flush >= self.index_flush_interval:
+                    self._flush_index()
 
-        # Save the updated session
-        self._save_session(session_id, session_data)
-        print(f"✅ Added message to session {session_id}")
+            cached = self._cache.get(session_id)
+            if cached is not None:
+                cached["messages"].extend(_copy_message(m) for m in new_messages)
+                cached["message_count"] = last["id"]
+                cached["last_updated"] = last["timestamp"]
+        logger.debug("Added %s message(s) to session %s", len(new_messages), session_id)
         return True
 
     def get_session(self, session_id: str) -> Optional[Dict]:
@@ -115,68 +674,161 @@ class SimpleSessionStore:
         Returns:
             Session data dictionary or None if not found
         """
-        session_file = self._get_session_file(session_id)
-        if not os.path.exists(session_file):
+        lock = self._session_lock(session_id)
+        if lock is None:
+            return None
+        with lock:
+            session_data = self._cache.get(session_id)
+            if session_data is None:
+                session_data = self._read_session(session_id)
+                if session_data is None:
+                    return None
+                self._cache.set(session_id, session_data)
+            return _copy_session(session_data)
+
+    def _read_session(self, session_id: str) -> Optional[Dict]:
+        """Load a session from disk; the caller must hold the session's lock."""
+        meta_file = self._get_meta_file(session_id)
+        if not os.path.exists(meta_file):
             return None
 
         try:
-            with open(session_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            print(f"❌ Error loading session {session_id}: {e}")
+            session_data = _read_json(meta_file)
+            messages = list(self._iter_messages(session_id))
+        except (json.JSONDecodeError, EOFError, OSError) as e:
+            logger.error("Error loading session %s: %s", session_id, e)
             return None
 
-    def get_session_messages(self, session_id: str) -> List[Dict]:
+        session_data.setdefault("metadata", {})
+        session_data["messages"] = messages
+        session_data["message_count"] = len(messages)
+        session_data["last_updated"] = (messages[-1]["timestamp"] if messages
+                                        else session_data["created_at"])
+        return session_data
+
+    def _iter_messages(self, session_id: str) -> Iterator[Dict]:
+        """Stream the messages of a session from its log."""
+        messages_file = self._get_messages_file(session_id)
+        if not os.path.exists(messages_file):
+            return
+        with self._open_messages(messages_file) as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A write interrupted by a crash; keep the completed messages
+                    logger.warning("Ignoring incomplete message in session %s", session_id)
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = _loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable message in session %s", session_id)
+                    continue
+                yield message
+
+    def get_first_message(self, session_id: str) -> Optional[Dict]:
+        """
+        Get the first message of a session without reading the rest of it.
+
+        Args:
+            session_id: Session to get the message from
+
+        Returns:
+            Message dictionary or None if the session has no messages
+        """
+        messages = self.get_session_messages(session_id, limit=1)
+        return messages[0] if messages else None
+
+    def get_session_messages(self, session_id: str, offset: int = 0,
+                             limit: int = None) -> List[Dict]:
         """
         Get just the messages from a session.
 
+        Only the requested page of the log is parsed.
+
         Args:
             session_id: Session to get messages from
+            offset: Number of leading messages to skip
+            limit: Maximum number of messages to return (all if None)
 
         Returns:
             List of message dictionaries
         """
-        session_data = self.get_session(session_id)
-        if session_data:
-            return session_data.get("messages", [])
-        return []
+        stop = None if limit is None else offset + limit
+        lock = self._session_lock(session_id)
+        if lock is None:
+            return []
+        try:
+            with lock:
+                return list(islice(self._iter_messages(session_id), offset, stop))
+        except (json.JSONDecodeError, EOFError, OSError) as e:
+            logger.error("Error loading messages for session %s: %s", session_id, e)
+            return []
 
-    def list_sessions(self, user_id: str = None) -> List[Dict]:
+    def owns(self, user_id: str, session_id: str) -> bool:
         """
-        List all sessions, optionally filtered by user.
+        Check whether a session exists and belongs to a user.
+
+        Args:
+            user_id: User to check
+            session_id: Session to check
+
+        Returns:
+            True if the session belongs to the user, False otherwise
+        """
+        summary = self._get_summary(session_id)
+        return bool(summary) and summary["user_id"] == user_id
+
+    def get_session_summary(self, session_id: str) -> Optional[Dict]:
+        """
+        Get a session's summary without loading its messages.
+
+        Args:
+            session_id: Session to summarize
+
+        Returns:
+            Session summary dictionary or None if not found
+        """
+        summary = self._get_summary(session_id)
+        if summary is None:
+            return None
+        with self._global_lock:
+            return dict(summary)
+
+    def get_sessions_version(self, user_id: str = None) -> str:
+        """
+        Get a token that changes whenever list_sessions(user_id) would change.
 
         Args:
             user_id: Optional user filter
 
         Returns:
-            List of session summaries
+            Version string built from a counter that every create, add and
+            delete bumps (timestamps can repeat or go backwards with the clock)
         """
-        sessions = []
+        with self._global_lock:
+            if user_id is None:
+                return f"{self._epoch}:{self._generation}"
+            return f"{self._epoch}:{self._user_generations.get(user_id, 0)}"
 
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith('.json'):
-                session_id = filename[:-5]  # Remove .json extension
-                session_data = self.get_session(session_id)
+    def list_sessions(self, user_id: str = None) -> List[Dict]:
+        """
+        List all sessions, optionally filtered by user.
 
-                if session_data:
-                    # Apply user filter if specified
-                    if user_id is None or session_data.get("user_id") == user_id:
-                        summary = {
-                            "session_id": session_data["session_id"],
-                            "user_id": session_data.get("user_id"),
-                            "created_at": session_data["created_at"],
-                            "last_updated": session_data["last_updated"],
-                            "message_count": session_data["message_count"]
-                        }
-                        sessions.append(summary)
+        Args:
+            user_id: Optional user filter
 
-        # Sort by last updated (most recent first)
-        sessions.sort(key=lambda x: x["last_updated"], reverse=True)
-        return sessions
+        Returns:
+            List of session summaries (including each session's first message)
+        """
+        # Walk the presorted keys newest first; no per-call sort
+        with self._global_lock:
+            keys = self._recency if user_id is None else self._user_recency.get(user_id, [])
+            return [dict(self._index[session_id]) for _, session_id in reversed(keys)]
 
     def delete_session(self, session_id: str) -> bool:
         """
-        Delete a session and its file.
+        Delete a session and its files.
 
         Args:
             session_id: Session to delete
@@ -184,18 +836,37 @@ class SimpleSessionStore:
         Returns:
             True if successful, False otherwise
         """
-        session_file = self._get_session_file(session_id)
-        if os.path.exists(session_file):
+        # Only touch the filesystem for known sessions; ids are not trusted as paths
+        with self._global_lock:
+            if session_id not in self._index:
+                logger.warning("Session %s not found", session_id)
+                return False
+
+        session_dir = self._get_session_dir(session_id)
+        lock = self._session_lock(session_id)
+        if lock is None:
+            logger.warning("Session %s not found", session_id)
+            return False
+        with lock:
+            if not os.path.exists(self._get_meta_file(session_id)):
+                logger.warning("Session %s not found", session_id)
+                return False
+            self._cache.pop(session_id)
             try:
-                os.remove(session_file)
-                print(f"✅ Deleted session: {session_id}")
-                return True
+                shutil.rmtree(session_dir)
             except OSError as e:
-                print(f"❌ Error deleting session {session_id}: {e}")
+                logger.error("Error deleting session %s: %s", session_id, e)
                 return False
-        else:
-            print(f"❌ Session {session_id} not found")
-            return False
+
+        with self._global_lock:
+            self._session_locks.pop(session_id, None)
+            self._repaired.discard(session_id)
+            summary = self._index.pop(session_id, None)
+            if summary is not None:
+                self._untrack(summary)
+                self._flush_index()
+        logger.debug("Deleted session: %s", session_id)
+        return True
 
     def cleanup_old_sessions(self, days_old: int = 7) -> int:
         """
@@ -212,37 +883,489 @@ class SimpleSessionStore:
         cutoff_date = datetime.now() - timedelta(days=days_old)
         removed_count = 0
 
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith('.json'):
-                session_id = filename[:-5]
-                session_data = self.get_session(session_id)
+        # Creation times come from the index, so no session files are read
+        with self._global_lock:
+            summaries = list(self._index.items())
+        for session_id, summary in summaries:
+            created_date = datetime.fromisoformat(summary["created_at"])
+            if created_date < cutoff_date:
+                if self.delete_session(session_id):
+                    removed_count += 1
 
-                if session_data:
-                    created_date = datetime.fromisoformat(session_data["created_at"])
-                    if created_date < cutoff_date:
-                        if self.delete_session(session_id):
-                            removed_count += 1
-
-        print(f"✅ Cleaned up {removed_count} old sessions")
+        logger.debug("Cleaned up %s old sessions", removed_count)
+        if self.compress_after_days is not None:
+            self.compress_idle_sessions(self.compress_after_days)
         return removed_count
 
-    def _save_session(self, session_id: str, session_data: Dict):
-        """Save session data to file."""
-        session_file = self._get_session_file(session_id)
+    def compress_idle_sessions(self, days_idle: float = 1) -> int:
+        """
+        Gzip the message logs of sessions that haven't changed for a while.
+
+        Each log is compressed as a whole, which shrinks typical chat logs
+        several times over; the next message to such a session turns its log
+        back into a plain, appendable one.
+
+        Args:
+            days_idle: Compress sessions last updated more than this many days ago
+
+        Returns:
+            Number of logs compressed
+        """
+        from datetime import timedelta
+
+        cutoff = (datetime.now() - timedelta(days=days_idle)).isoformat()
+        with self._global_lock:
+            keys = self._recency[:bisect.bisect_left(self._recency, (cutoff,))]
+
+        compressed_count = 0
+        for _, session_id in keys:
+            lock = self._session_lock(session_id)
+            if lock is None:
+                continue
+            with lock:
+                with self._global_lock:
+                    summary = self._index.get(session_id)
+                if summary is None or summary["last_updated"] >= cutoff:
+                    continue
+                try:
+                    if self._compress_log(session_id):
+                        compressed_count += 1
+                except OSError as e:
+                    logger.error("Error compressing session %s: %s", session_id, e)
+
+        logger.debug("Compressed %s idle sessions", compressed_count)
+        return compressed_count
+
+    def _write_meta(self, session_id: str, session_data: Dict):
+        """Save the session's metadata (everything except its messages) to file."""
+        meta = {
+            "session_id": session_data["session_id"],
+            "user_id": session_data.get("user_id"),
+            "created_at": session_data["created_at"]
+        }
+        if session_data.get("metadata"):
+            meta["metadata"] = session_data["metadata"]
         try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            self._write_atomic(self._get_meta_file(session_id), _dumps(meta))
         except Exception as e:
-            print(f"❌ Error saving session {session_id}: {e}")
+            logger.error("Error saving session %s: %s", session_id, e)
+
+    def get_stats(self) -> Dict:
+        """Get statistics about all sessions."""
+        with self._global_lock:
+            total_sessions = len(self._index)
+            total_messages = sum(s["message_count"] for s in self._index.values())
+
+        return {
+            "total_sessions": total_sessions,
+            "total_messages": total_messages,
+            "storage_directory": self.storage_dir,
+            "average_messages_per_session": total_messages / total_sessions if total_sessions else 0
+        }
+
+
+class SQLiteSessionStore:
+    """
+    Session storage backed by a SQLite database in WAL mode.
+
+    Drop-in alternative to SimpleSessionStore with the same public API.
+    Messages are rows rather than files, so adding a message is a single
+    insert and listing a user's sessions is served by an index on
+    ``(user_id, last_updated)``. Recently read sessions are cached in memory
+    for ``cache_ttl`` seconds, as in SimpleSessionStore.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id TEXT,
+            created_at TEXT NOT NULL,
+            last_updated TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            metadata_json TEXT
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+            id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            metadata_json TEXT,
+            PRIMARY KEY (session_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_user_updated
+            ON sessions (user_id, last_updated DESC);
+
+        -- Change counters for get_sessions_version: scope '*' covers all
+        -- sessions, 'user:<user_id>' one user's. The triggers bump them in
+        -- the same transaction as every write to sessions.
+        CREATE TABLE IF NOT EXISTS generations (
+            scope TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS sessions_insert_generation
+        AFTER INSERT ON sessions BEGIN
+            INSERT INTO generations (scope, generation)
+                SELECT scope, 1 FROM (SELECT '*' AS scope UNION ALL SELECT 'user:' || NEW.user_id)
+                WHERE scope IS NOT NULL
+                ON CONFLICT (scope) DO UPDATE SET generation = generation + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS sessions_update_generation
+        AFTER UPDATE ON sessions BEGIN
+            INSERT INTO generations (scope, generation)
+                SELECT scope, 1 FROM (SELECT '*' AS scope UNION ALL SELECT 'user:' || NEW.user_id)
+                WHERE scope IS NOT NULL
+                ON CONFLICT (scope) DO UPDATE SET generation = generation + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS sessions_delete_generation
+        AFTER DELETE ON sessions BEGIN
+            INSERT INTO generations (scope, generation)
+                SELECT scope, 1 FROM (SELECT '*' AS scope UNION ALL SELECT 'user:' || OLD.user_id)
+                WHERE scope IS NOT NULL
+                ON CONFLICT (scope) DO UPDATE SET generation = generation + 1;
+        END;
+    """
+
+    def __init__(self, storage_dir: str = "sessions", cache_size: int = 1024,
+                 cache_ttl: float = 5.0):
+        """
+        Initialize the session store.
+
+        Args:
+            storage_dir: Directory holding the ``sessions.db`` database
+            cache_size: Maximum number of sessions kept in the read cache
+            cache_ttl: Seconds a cached session stays valid (0 disables caching)
+        """
+        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+        self.storage_dir = os.path.join(BASE_DIR, storage_dir)
+        os.makedirs(self.storage_dir, exist_ok=True)
+        self.db_path = os.path.join(self.storage_dir, "sessions.db")
+
+        # One connection shared by all threads; the lock serializes its use
+        self._lock = threading.RLock()
+        self._cache = _TTLCache(cache_size, cache_ttl)
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _rollback(self):
+        """Roll back the open transaction, if any; the caller must hold the lock."""
+        if self._conn.in_transaction:
+            self._conn.execute("ROLLBACK")
+
+    def create_session(self, user_id: str = None, metadata: Dict = None) -> str:
+        """
+        Create a new session.
+
+        Args:
+            user_id: Optional user identifier
+            metadata: Additional session metadata
+
+        Returns:
+            Session ID string
+        """
+        session_id = str(uuid.uuid4())
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, user_id, created_at, last_updated, metadata_json)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (session_id, user_id, now, now, _metadata_json(metadata)))
+        logger.debug("Created session: %s", session_id)
+        return session_id
+
+    def add_message(self, session_id: str, role: str, content: str,
+                   metadata: Dict = None) -> bool:
+        """
+        Add a message to a session.
+
+        Args:
+            session_id: Session to add message to
+            role: Message role ('user' or 'assistant')
+            content: Message content
+            metadata: Additional message metadata (stored only if non-empty)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.add_messages(session_id, [(role, content, metadata)])
+
+    def add_messages(self, session_id: str, messages: List[Tuple]) -> bool:
+        """
+        Add several messages to a session in one transaction.
+
+        Args:
+            session_id: Session to add messages to
+            messages: ``(role, content)`` or ``(role, content, metadata)`` tuples
+
+        Returns:
+            True if successful, False otherwise (no messages are added)
+        """
+        if any(not message[1].strip() for message in messages):
+            logger.warning("Message content cannot be empty")
+            return False
+        if not messages:
+            return True
+
+        # Build and serialize everything up front so the transaction only runs SQL
+        new_messages = _build_messages(1, messages)
+        metadata_json = [_metadata_json(m.get("metadata")) for m in new_messages]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT message_count FROM sessions WHERE session_id = ?",
+                    (session_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    logger.warning("Session %s not found", session_id)
+                    return False
+
+                for i, message in enumerate(new_messages, row["message_count"] + 1):
+                    message["id"] = i
+                last = new_messages[-1]
+                self._conn.executemany(
+                    "INSERT INTO messages (session_id, id, role, content, timestamp, metadata_json)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, m["id"], m["role"], m["content"], m["timestamp"], meta)
+                     for m, meta in zip(new_messages, metadata_json)])
+                self._conn.execute(
+                    "UPDATE sessions SET message_count = ?, last_updated = ?"
+                    " WHERE session_id = ?",
+                    (last["id"], last["timestamp"], session_id))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._rollback()
+                logger.error("Error saving message to session %s: %s", session_id, e)
+                return False
+            except BaseException:
+                # Never leave the shared connection inside an open transaction
+                self._rollback()
+                raise
+
+            cached = self._cache.get(session_id)
+            if cached is not None:
+                cached["messages"].extend(_copy_message(m) for m in new_messages)
+                cached["message_count"] = last["id"]
+                cached["last_updated"] = last["timestamp"]
+
+        logger.debug("Added %s message(s) to session %s", len(new_messages), session_id)
+        return True
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """
+        Retrieve a complete session.
+
+        Args:
+            session_id: Session to retrieve
+
+        Returns:
+            Session data dictionary or None if not found
+        """
+        with self._lock:
+            session_data = self._cache.get(session_id)
+            if session_data is not None:
+                return _copy_session(session_data)
+
+            row = self._conn.execute(
+                "SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            session_data = {
+                "session_id": row["session_id"],
+                "user_id": row["user_id"],
+                "created_at": row["created_at"],
+                "last_updated": row["last_updated"],
+                "message_count": row["message_count"],
+                "metadata": _loads(row["metadata_json"]) if row["metadata_json"] else {},
+                "messages": self.get_session_messages(session_id)
+            }
+            self._cache.set(session_id, session_data)
+            return _copy_session(session_data)
+
+    def get_session_messages(self, session_id: str, offset: int = 0,
+                             limit: int = None) -> List[Dict]:
+        """
+        Get just the messages from a session.
+
+        Args:
+            session_id: Session to get messages from
+            offset: Number of leading messages to skip
+            limit: Maximum number of messages to return (all if None)
+
+        Returns:
+            List of message dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content, timestamp, metadata_json FROM messages"
+                " WHERE session_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (session_id, -1 if limit is None else limit, offset)).fetchall()
+        return [self._message_from_row(row) for row in rows]
+
+    def get_first_message(self, session_id: str) -> Optional[Dict]:
+        """
+        Get the first message of a session without reading the rest of it.
+
+        Args:
+            session_id: Session to get the message from
+
+        Returns:
+            Message dictionary or None if the session has no messages
+        """
+        messages = self.get_session_messages(session_id, limit=1)
+        return messages[0] if messages else None
+
+    @staticmethod
+    def _message_from_row(row: sqlite3.Row) -> Dict:
+        """Convert a messages row to a message dictionary."""
+        message = {
+            "id": row["id"],
+            "role": row["role"],
+            "content": row["content"],
+            "timestamp": row["timestamp"]
+        }
+        if row["metadata_json"]:
+            message["metadata"] = _loads(row["metadata_json"])
+        return message
+
+    def owns(self, user_id: str, session_id: str) -> bool:
+        """
+        Check whether a session exists and belongs to a user.
+
+        Args:
+            user_id: User to check
+            session_id: Session to check
+
+        Returns:
+            True if the session belongs to the user, False otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_id FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row is not None and row["user_id"] == user_id
+
+    def get_session_summary(self, session_id: str) -> Optional[Dict]:
+        """
+        Get a session's summary without loading its messages.
+
+        Args:
+            session_id: Session to summarize
+
+        Returns:
+            Session summary dictionary or None if not found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, user_id, created_at, last_updated, message_count"
+                " FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_sessions_version(self, user_id: str = None) -> str:
+        """
+        Get a token that changes whenever list_sessions(user_id) would change.
+
+        Args:
+            user_id: Optional user filter
+
+        Returns:
+            Version string built from a counter that every create, add and
+            delete bumps (timestamps can repeat or go backwards with the clock)
+        """
+        scope = '*' if user_id is None else f"user:{user_id}"
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM generations WHERE scope = ?", (scope,)).fetchone()
+        return str(row["generation"] if row else 0)
+
+    def list_sessions(self, user_id: str = None) -> List[Dict]:
+        """
+        List all sessions, optionally filtered by user.
+
+        Args:
+            user_id: Optional user filter
+
+        Returns:
+            List of session summaries (including each session's first message)
+        """
+        query = (
+            "SELECT session_id, user_id, created_at, last_updated, message_count,"
+            " COALESCE((SELECT content FROM messages m"
+            "           WHERE m.session_id = s.session_id AND m.id = 1), '') AS first_message"
+            " FROM sessions s"
+        )
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        query += " ORDER BY last_updated DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        Delete a session and its messages.
+
+        Args:
+            session_id: Session to delete
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            self._cache.pop(session_id)
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        if cursor.rowcount:
+            logger.debug("Deleted session: %s", session_id)
+            return True
+        logger.warning("Session %s not found", session_id)
+        return False
+
+    def cleanup_old_sessions(self, days_old: int = 7) -> int:
+        """
+        Remove sessions older than specified days.
+
+        Args:
+            days_old: Remove sessions older than this many days
+
+        Returns:
+            Number of sessions removed
+        """
+        from datetime import timedelta
+
+        cutoff_date = datetime.now() - timedelta(days=days_old)
+        with self._lock:
+            self._cache.clear()
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE created_at < ?", (cutoff_date.isoformat(),))
+        removed_count = cursor.rowcount
+
+        logger.debug("Cleaned up %s old sessions", removed_count)
+        return removed_count
 
     def get_stats(self) -> Dict:
         """Get statistics about all sessions."""
-        sessions = self.list_sessions()
-        total_messages = sum(s["message_count"] for s in sessions)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM sessions").fetchone()
+        total_sessions, total_messages = row[0], row[1]
 
         return {
-            "total_sessions": len(sessions),
+            "total_sessions": total_sessions,
             "total_messages": total_messages,
             "storage_directory": self.storage_dir,
-            "average_messages_per_session": total_messages / len(sessions) if sessions else 0
+            "average_messages_per_session": total_messages / total_sessions if total_sessions else 0
         }
@@ -4,15 +4,31 @@ Test suite for SimpleSessionStore
 Run with: python -m pytest test_session_store.py -v
 """
 
+import json
 import pytest
 import tempfile
 import os
 import shutil
-from session_store import SimpleSessionStore
+import threading
+from datetime import datetime, timedelta
+import session_store
+from session_store import SimpleSessionStore, SQLiteSessionStore
+
+@pytest.fixture(params=[SimpleSessionStore, SQLiteSessionStore])
+def temp_store(request):
+    """Create a temporary session store for testing, once per backend."""
+    temp_dir = tempfile.mkdtemp()
+    store = request.param(temp_dir)
+    yield store
+
+    # Cleanup
+    if hasattr(store, "close"):
+        store.close()
+    shutil.rmtree(temp_dir)
 
 @pytest.fixture
-def temp_store():
-    """Create a temporary session store for testing."""
+def file_store():
+    """Create a temporary file-backed session store for testing."""
     temp_dir = tempfile.mkdtemp()
     store = SimpleSessionStore(temp_dir)
     yield store
@@ -110,7 +126,7 @@ def test_session_persistence(temp_store):
     temp_store.add_message(session_id, "user", "Persistent message")
 
     # Create new store instance pointing to same directory
-    new_store = SimpleSessionStore(temp_store.storage_dir)
+    new_store = type(temp_store)(temp_store.storage_dir)
 
     # Verify session still exists
     session_data = new_store.get_session(session_id)
@@ -191,3 +207,372 @@ def test_session_cleanup(temp_store):
     removed_count = temp_store.cleanup_old_sessions(days_old=7)
     assert isinstance(removed_count, int)
     assert removed_count >= 0
+
+def test_session_index(file_store):
+    """Test that list_sessions is served from the summary index."""
+    session_id = file_store.create_session("test_user")
+    file_store.add_message(session_id, "user", "First message")
+    file_store.add_message(session_id, "assistant", "Reply")
+
+    summary = file_store.list_sessions("test_user")[0]
+    assert summary["message_count"] == 2
+    assert summary["first_message"] == "First message"
+
+    # Index is rebuilt from the session files if it goes missing
+    os.remove(os.path.join(file_store.storage_dir, "_index.json"))
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    assert new_store.list_sessions("test_user") == [summary]
+
+    file_store.delete_session(session_id)
+    assert file_store.list_sessions() == []
+
+def test_legacy_session_migration(file_store):
+    """Test that single-file sessions are migrated to the message log layout."""
+    legacy = {
+        "session_id": "legacy-session",
+        "user_id": "test_user",
+        "created_at": "2024-01-01T00:00:00",
+        "last_updated": "2024-01-01T00:01:00",
+        "message_count": 1,
+        "metadata": {},
+        "messages": [{"id": 1, "role": "user", "content": "Old message",
+                      "timestamp": "2024-01-01T00:01:00", "metadata": {}}]
+    }
+    with open(os.path.join(file_store.storage_dir, "legacy-session.json"), "w") as f:
+        json.dump(legacy, f)
+    os.remove(os.path.join(file_store.storage_dir, "_index.json"))
+
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    assert new_store.get_session("legacy-session") == legacy
+    assert new_store.add_message("legacy-session", "assistant", "New reply")
+    assert new_store.get_session_messages("legacy-session")[1]["id"] == 2
+
+def test_cleanup_removes_old_sessions(temp_store, monkeypatch):
+    """Test that cleanup removes sessions created before the cutoff."""
+    monkeypatch.setattr(session_store, "_now", lambda: "2000-01-01T00:00:00")
+    old_session = temp_store.create_session("test_user")
+    monkeypatch.undo()
+    new_session = temp_store.create_session("test_user")
+
+    assert temp_store.cleanup_old_sessions(days_old=7) == 1
+    assert temp_store.get_session(old_session) is None
+    assert temp_store.get_session(new_session) is not None
+
+def test_concurrent_add_message(temp_store):
+    """Test that concurrent writers to one session don't lose messages."""
+    session_id = temp_store.create_session("test_user")
+
+    def writer(n):
+        for i in range(25):
+            temp_store.add_message(session_id, "user", f"Writer {n} message {i}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    messages = temp_store.get_session_messages(session_id)
+    assert len(messages) == 200
+    assert [m["id"] for m in messages] == list(range(1, 201))
+    assert temp_store.list_sessions()[0]["message_count"] == 200
+
+def test_list_sessions_summary(temp_store):
+    """Test that session summaries carry counts and the first message."""
+    temp_store.create_session("test_user")
+    session_id = temp_store.create_session("test_user")
+    temp_store.add_message(session_id, "user", "First message")
+    temp_store.add_message(session_id, "assistant", "Reply")
+
+    # Most recently updated first
+    sessions = temp_store.list_sessions("test_user")
+    assert sessions[0]["session_id"] == session_id
+    assert sessions[0]["message_count"] == 2
+    assert sessions[0]["first_message"] == "First message"
+    assert sessions[1]["first_message"] == ""
+
+def test_message_pagination(temp_store):
+    """Test paginated message retrieval and first-message lookup."""
+    session_id = temp_store.create_session("test_user")
+    assert temp_store.get_first_message(session_id) is None
+
+    for i in range(5):
+        temp_store.add_message(session_id, "user", f"Message {i + 1}")
+
+    assert temp_store.get_first_message(session_id)["content"] == "Message 1"
+    page = temp_store.get_session_messages(session_id, offset=1, limit=2)
+    assert [m["id"] for m in page] == [2, 3]
+    assert len(temp_store.get_session_messages(session_id, offset=3)) == 2
+    assert temp_store.get_first_message("fake-session-id") is None
+
+def test_owns(temp_store):
+    """Test session ownership checks."""
+    session_id = temp_store.create_session("user1")
+
+    assert temp_store.owns("user1", session_id)
+    assert not temp_store.owns("user2", session_id)
+    assert not temp_store.owns("user1", "fake-session-id")
+
+    temp_store.delete_session(session_id)
+    assert not temp_store.owns("user1", session_id)
+
+def test_session_read_cache(temp_store):
+    """Test that cached sessions stay in sync with writes."""
+    session_id = temp_store.create_session("test_user")
+    session_data = temp_store.get_session(session_id)
+
+    # Callers get copies, so changing one doesn't affect the cache
+    session_data["message_count"] = 99
+    session_data["messages"].append({"id": 99, "content": "Injected"})
+    assert temp_store.get_session(session_id)["message_count"] == 0
+    assert temp_store.get_session(session_id)["messages"] == []
+
+    metadata = {"tags": ["greeting"]}
+    temp_store.add_message(session_id, "user", "Hello", metadata)
+    session_data = temp_store.get_session(session_id)
+    assert session_data["message_count"] == 1
+    assert session_data["messages"][0]["content"] == "Hello"
+
+    # Nested messages and metadata are copies too
+    metadata["tags"].append("changed")
+    session_data["messages"][0]["content"] = "Changed"
+    session_data["messages"][0]["metadata"]["tags"].append("changed")
+    session_data["metadata"]["topic"] = "Changed"
+    session_data = temp_store.get_session(session_id)
+    assert session_data["messages"][0]["content"] == "Hello"
+    assert session_data["messages"][0]["metadata"] == {"tags": ["greeting"]}
+    assert session_data["metadata"] == {}
+
+    temp_store.delete_session(session_id)
+    assert temp_store.get_session(session_id) is None
+
+def test_compress_idle_sessions(file_store, monkeypatch):
+    """Test that idle sessions' logs are gzipped whole and reopen for appends."""
+    monkeypatch.setattr(session_store, "_now", lambda: "2000-01-01T00:00:00")
+    idle_session = file_store.create_session("test_user")
+    file_store.add_messages(idle_session, [
+        ("user" if i % 2 else "assistant", f"Message {i}: how should we plan the next release?")
+        for i in range(200)])
+    monkeypatch.undo()
+    active_session = file_store.create_session("test_user")
+    file_store.add_message(active_session, "user", "Still talking")
+
+    idle_dir = os.path.join(file_store.storage_dir, idle_session)
+    plain_size = os.path.getsize(os.path.join(idle_dir, "messages.jsonl"))
+    assert file_store.compress_idle_sessions(days_idle=1) == 1
+    assert sorted(os.listdir(idle_dir)) == ["messages.jsonl.gz", "meta.json"]
+    assert os.path.getsize(os.path.join(idle_dir, "messages.jsonl.gz")) * 4 < plain_size
+    assert "messages.jsonl" in os.listdir(os.path.join(file_store.storage_dir, active_session))
+
+    # Compressed logs read transparently, also from a fresh store
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    assert new_store.get_session(idle_session)["message_count"] == 200
+    assert new_store.get_first_message(idle_session)["content"].startswith("Message 0")
+
+    # A new message turns the log back into a plain one
+    assert new_store.add_message(idle_session, "user", "Back again") == True
+    assert sorted(os.listdir(idle_dir)) == ["messages.jsonl", "meta.json"]
+    assert new_store.get_session_messages(idle_session, offset=199)[1]["id"] == 201
+
+def test_cleanup_compresses_idle_sessions(file_store, monkeypatch):
+    """Test that cleanup compresses idle logs when compress_after_days is set."""
+    store = SimpleSessionStore(file_store.storage_dir, compress_after_days=1)
+    three_days_ago = (datetime.now() - timedelta(days=3)).isoformat()
+    monkeypatch.setattr(session_store, "_now", lambda: three_days_ago)
+    session_id = store.create_session("test_user")
+    store.add_message(session_id, "user", "Hello")
+    monkeypatch.undo()
+
+    assert store.cleanup_old_sessions(days_old=7) == 0
+    session_dir = os.path.join(store.storage_dir, session_id)
+    assert sorted(os.listdir(session_dir)) == ["messages.jsonl.gz", "meta.json"]
+    assert store.get_session_messages(session_id)[0]["content"] == "Hello"
+def test_interrupted_write_recovery(file_store):
+    """Test that a torn trailing log line doesn't hide completed messages."""
+    session_id = file_store.create_session("test_user")
+    file_store.add_message(session_id, "user", "Completed message")
+
+    with open(os.path.join(file_store.storage_dir, session_id, "messages.jsonl"), "ab") as f:
+        f.write(b'{"id": 2, "role": "assis')
+
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    messages = new_store.get_session_messages(session_id)
+    assert [m["content"] for m in messages] == ["Completed message"]
+    assert not [f for f in os.listdir(file_store.storage_dir) if f.endswith(".tmp")]
+
+    # The torn line is dropped before the next append, not glued onto it
+    assert new_store.add_message(session_id, "assistant", "Next message") == True
+    messages = SimpleSessionStore(file_store.storage_dir).get_session_messages(session_id)
+    assert [(m["id"], m["content"]) for m in messages] == [(1, "Completed message"),
+                                                           (2, "Next message")]
+
+def test_add_messages_batch(temp_store):
+    """Test adding a batch of messages at once."""
+    session_id = temp_store.create_session("test_user")
+    temp_store.add_message(session_id, "user", "Hello")
+
+    success = temp_store.add_messages(session_id, [
+        ("assistant", "Hi there!"),
+        ("user", "Tag this", {"tag": "batch"}),
+    ])
+    assert success == True
+
+    messages = temp_store.get_session_messages(session_id)
+    assert [m["id"] for m in messages] == [1, 2, 3]
+    assert messages[2]["metadata"]["tag"] == "batch"
+    assert temp_store.list_sessions()[0]["message_count"] == 3
+
+    # A batch with an empty message is rejected as a whole
+    assert temp_store.add_messages(session_id, [("user", "Ok"), ("user", " ")]) == False
+    assert len(temp_store.get_session_messages(session_id)) == 3
+
+def test_list_sessions_recency_order(temp_store):
+    """Test that updating a session moves it to the front of the listing."""
+    first = temp_store.create_session("user1")
+    second = temp_store.create_session("user1")
+    temp_store.create_session("user2")
+    assert [s["session_id"] for s in temp_store.list_sessions("user1")] == [second, first]
+
+    temp_store.add_message(first, "user", "Bump")
+    assert [s["session_id"] for s in temp_store.list_sessions("user1")] == [first, second]
+    assert temp_store.list_sessions()[0]["session_id"] == first
+
+    temp_store.delete_session(first)
+    assert [s["session_id"] for s in temp_store.list_sessions("user1")] == [second]
+
+def test_sessions_version(temp_store):
+    """Test that the listing version changes with every listing change."""
+    versions = [temp_store.get_sessions_version("test_user")]
+    session_id = temp_store.create_session("test_user")
+    versions.append(temp_store.get_sessions_version("test_user"))
+    temp_store.add_message(session_id, "user", "Hello")
+    versions.append(temp_store.get_sessions_version("test_user"))
+
+    # Other users' sessions don't affect it
+    temp_store.create_session("other_user")
+    assert temp_store.get_sessions_version("test_user") == versions[-1]
+
+    temp_store.delete_session(session_id)
+    versions.append(temp_store.get_sessions_version("test_user"))
+    assert all(a != b for a, b in zip(versions, versions[1:]))
+
+    assert temp_store.get_session_summary(session_id) is None
+
+def test_sessions_version_survives_clock_rollback(temp_store, monkeypatch):
+    """Test that the listing version changes even when the clock goes backwards."""
+    monkeypatch.setattr(session_store, "_now", lambda: "2030-01-01T02:30:00")
+    older_session = temp_store.create_session("test_user")
+    temp_store.create_session("test_user")
+    version = temp_store.get_sessions_version("test_user")
+
+    # e.g. a DST fall-back: the new message is stamped before the newest session
+    monkeypatch.setattr(session_store, "_now", lambda: "2030-01-01T02:00:00")
+    temp_store.add_message(older_session, "user", "Hello")
+    assert temp_store.get_sessions_version("test_user") != version
+
+def test_empty_metadata_omitted(temp_store):
+    """Test that empty message metadata isn't stored."""
+    session_id = temp_store.create_session("test_user")
+    temp_store.add_message(session_id, "user", "No metadata")
+    temp_store.add_message(session_id, "user", "Empty metadata", {})
+
+    messages = temp_store.get_session_messages(session_id)
+    assert all("metadata" not in m for m in messages)
+    assert temp_store.get_session(session_id)["metadata"] == {}
+
+def test_index_reconciled_on_load(file_store):
+    """Test that sessions missing from a stale index are picked up on load."""
+    other_store = SimpleSessionStore(file_store.storage_dir)
+    first = file_store.create_session("test_user")
+    second = other_store.create_session("test_user")
+    file_store.add_message(first, "user", "Hello")
+
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    sessions = {s["session_id"]: s for s in new_store.list_sessions()}
+    assert set(sessions) == {first, second}
+    assert sessions[first]["message_count"] == 1
+
+    # Index entries whose session directory is gone are dropped
+    shutil.rmtree(os.path.join(file_store.storage_dir, second))
+    assert [s["session_id"] for s in SimpleSessionStore(file_store.storage_dir).list_sessions()] == [first]
+
+def test_unflushed_index_recovered(file_store):
+    """Test that message writes defer the index flush and are recovered on reopen."""
+    session_id = file_store.create_session("test_user")
+    index_path = os.path.join(file_store.storage_dir, "_index.json")
+    with open(index_path, "rb") as f:
+        flushed_index = f.read()
+
+    file_store.add_message(session_id, "user", "One")
+    file_store.add_message(session_id, "user", "Two")
+    with open(index_path, "rb") as f:
+        assert f.read() == flushed_index
+
+    # Reopen without flushing, as after a crash
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    assert new_store.list_sessions()[0]["message_count"] == 2
+    new_store.add_message(session_id, "user", "Three")
+    assert [m["id"] for m in new_store.get_session_messages(session_id)] == [1, 2, 3]
+
+    new_store.close()
+    with open(index_path, "rb") as f:
+        assert b'"message_count":3' in f.read().replace(b" ", b"")
+
+def test_stale_index_does_not_reuse_ids(file_store, monkeypatch):
+    """Test that an index flushed between a log append and its summary update doesn't reuse ids."""
+    session_id = file_store.create_session("test_user")
+    messages_file = os.path.join(file_store.storage_dir, session_id, "messages.jsonl")
+    append_messages = file_store._append_messages
+
+    def append_then_flush(sid, messages):
+        append_messages(sid, messages)
+        # Another thread flushes the index before this append's summary update,
+        # so the index file is newer than the log but has the old count
+        os.utime(messages_file, ns=(0, 0))
+        file_store.create_session("other_user")
+
+    monkeypatch.setattr(file_store, "_append_messages", append_then_flush)
+    file_store.add_message(session_id, "user", "First")
+
+    # Reopen without close(), as after the app process exits
+    new_store = SimpleSessionStore(file_store.storage_dir)
+    assert new_store.add_message(session_id, "user", "Second") == True
+    assert [m["id"] for m in new_store.get_session_messages(session_id)] == [1, 2]
+    assert new_store.get_session_summary(session_id)["message_count"] == 2
+    assert new_store.get_session_summary(session_id)["first_message"] == "First"
+
+def test_delete_rejects_unknown_ids(file_store):
+    """Test that delete_session never treats unknown ids as paths."""
+    session_id = file_store.create_session("test_user")
+    assert file_store.delete_session("..") == False
+    assert file_store.delete_session(os.path.join(session_id, "..")) == False
+    assert os.path.isdir(file_store.storage_dir)
+    assert file_store.get_session(session_id) is not None
+
+def test_no_locks_for_unknown_sessions(file_store):
+    """Test that lookups of missing sessions don't leave per-session locks behind."""
+    for i in range(10):
+        missing_id = f"missing-{i}"
+        assert file_store.get_session(missing_id) is None
+        assert file_store.get_session_messages(missing_id) == []
+        assert file_store.add_message(missing_id, "user", "Hello") == False
+        assert file_store.owns("test_user", missing_id) == False
+    assert file_store._session_locks == {}
+
+    # Sessions on disk but missing from the index are still found
+    session_id = file_store.create_session("test_user")
+    file_store.add_message(session_id, "user", "Hello")
+    with file_store._global_lock:
+        file_store._untrack(file_store._index.pop(session_id))
+    file_store._session_locks.clear()
+    assert file_store.get_session_summary(session_id)["message_count"] == 1
+    assert file_store.add_message(session_id, "user", "Again") == True
+
+def test_failed_add_messages_leaves_store_usable(temp_store):
+    """Test that a write that raises doesn't leave the store in a broken state."""
+    session_id = temp_store.create_session("test_user")
+    with pytest.raises(TypeError):
+        temp_store.add_message(session_id, "user", "Hello", {"bad": object()})
+    assert temp_store.add_message(session_id, "user", "Hello") == True
+    messages = temp_store.get_session_messages(session_id)
+    assert [(m["id"], m["content"]) for m in messages] == [(1, "Hello")]